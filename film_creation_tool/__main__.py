@@ -0,0 +1,14 @@
+import os
+import uvicorn
+
+# Each worker runs its own uvloop event loop and opens its own Frame.io
+# client and database pool from the app's startup hook
+if __name__ == "__main__":
+    uvicorn.run(
+        "film_creation_tool.app:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WEB_CONCURRENCY", "2"))
+    )
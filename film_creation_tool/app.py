@@ -1,33 +1,111 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks, WebSocket, Request
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks, WebSocket, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, FileResponse, Response
 from fastapi.websockets import WebSocketDisconnect
 from pydantic import BaseModel
-import psycopg
+import asyncpg
+import httpx
+import msgspec
+import orjson
 import os
 import io
-from frameioclient import FrameioClient
+import logging
+import re
+import asyncio
+import uuid
+from collections import defaultdict
+from cachetools import TTLCache
+from . import frameio_async as frameio
+from . import db
 from typing import Optional, List
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timedelta
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+logger = logging.getLogger(__name__)
+
+# CORS for the frontend. Do not remove this for full-stack development.
+# Explicit origins/methods/headers plus max_age let browsers cache preflights.
+ALLOWED_ORIGINS = [
+    origin.strip()
+    for origin in os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
+    if origin.strip()
+]
 
-# Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allows all origins
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],  # Allows all methods
-    allow_headers=["*"],  # Allows all headers
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
+# Compress larger JSON payloads (e.g. asset listings) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Frame.io API setup
 FRAMEIO_TOKEN = os.environ.get("FrameAPI")
 if not FRAMEIO_TOKEN:
     raise ValueError("Frame.io API token not found in environment variables")
 
-frameio_client = FrameioClient(FRAMEIO_TOKEN)
+FRAMEIO_TEAM_ID = os.environ.get("FrameTeamID")
+if not FRAMEIO_TEAM_ID:
+    raise ValueError("Frame.io team ID not found in environment variables")
+
+# Database setup
+DATABASE_URL = os.environ.get("DATABASE_URL")
+if not DATABASE_URL:
+    raise ValueError("Database URL not found in environment variables")
+
+# Every worker opens its own pool, so the per-worker size is derived from the
+# worker count to keep the total under DB_MAX_CONNECTIONS
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "2"))
+DB_MAX_CONNECTIONS = int(os.environ.get("DB_MAX_CONNECTIONS", "80"))
+DB_POOL_MAX_SIZE = max(2, DB_MAX_CONNECTIONS // WEB_CONCURRENCY)
+
+@app.on_event("startup")
+async def startup():
+    await frameio.start(FRAMEIO_TOKEN)
+    app.state.db = await asyncpg.create_pool(
+        dsn=DATABASE_URL,
+        min_size=1,
+        max_size=DB_POOL_MAX_SIZE,
+        max_queries=50000,
+        max_inactive_connection_lifetime=300,
+        command_timeout=60,
+        statement_cache_size=1024
+    )
+    async with app.state.db.acquire() as conn:
+        await db.ensure_schema(conn)
+
+    # One pooled connection per worker stays checked out to LISTEN for
+    # project updates published by whichever worker received the webhook
+    app.state.listener_task = None
+    await _start_listener()
+
+    app.state.prune_task = asyncio.create_task(_prune_export_jobs_periodically())
+
+@app.on_event("shutdown")
+async def shutdown():
+    await frameio.close()
+    app.state.prune_task.cancel()
+    if app.state.listener_task is not None:
+        app.state.listener_task.cancel()
+    listener = app.state.listener
+    listener.remove_termination_listener(_on_listener_terminated)
+    if not listener.is_closed():
+        await listener.remove_listener(PROJECT_UPDATES_CHANNEL, _on_project_update)
+    await app.state.db.release(listener)
+    await app.state.db.close()
+
+# Dependency that lends a pooled connection to a request.
+# Queries should use $n parameters so asyncpg's statement cache is reused.
+async def get_db(request: Request):
+    async with request.app.state.db.acquire() as conn:
+        yield conn
 
 class ProjectCreate(BaseModel):
     name: str
@@ -95,7 +173,7 @@ async def healthz():
 async def test_frameio_connection():
     try:
         # Test the connection by fetching the current user's info
-        user = frameio_client.get_me()
+        user = await frameio.get_me()
         return {"status": "connected", "user": user['email']}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to connect to Frame.io API: {str(e)}")
@@ -104,109 +182,175 @@ async def test_frameio_connection():
 async def create_project(project: ProjectCreate):
     try:
         # Create a new project in Frame.io
-        new_project = frameio_client.create_project(
+        new_project = await frameio.create_project(
+            FRAMEIO_TEAM_ID,
             name=project.name,
             private=True
         )
 
         # Update project with additional metadata
-        updated_project = frameio_client.update_project(
-            project_id=new_project['id'],
-            **project.dict(exclude_unset=True)
+        updated_project = await frameio.update_project(
+            new_project['id'],
+            **project.model_dump(exclude_unset=True)
         )
 
         return {"status": "success", "project": updated_project}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
 
+# Project folder that uploads of each file type are moved into
+_FOLDER_FOR = {
+    FileType.SCRIPT: "Scripts",
+    FileType.MEDIA: "Media",
+}
+
+# Splits "a, b ,c" into tags without a separate strip pass per tag
+_TAG_SPLIT = re.compile(r'\s*,\s*')
+
 @app.post("/projects/{project_id}/upload")
 async def upload_file(
     project_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     file_type: FileType = Form(...),
     tags: Optional[str] = Form(None)
 ):
     try:
         # Get the root asset of the project
-        root_asset = frameio_client.get_project(project_id)['root_asset_id']
+        root_asset = await get_root_asset_id(project_id)
 
-        # Upload the file to Frame.io
-        asset = frameio_client.upload(
+        # Stream the file to Frame.io
+        asset = await frameio.upload(
             parent_asset_id=root_asset,
-            file=file.file,
+            file=file,
             file_name=file.filename
         )
 
-        # Add metadata (tags) to the asset
-        if tags:
-            tag_list = [tag.strip() for tag in tags.split(',')]
-            frameio_client.update_asset(
-                asset_id=asset['id'],
-                tags=tag_list
-            )
+        tag_list = [tag for tag in _TAG_SPLIT.split(tags.strip()) if tag] if tags else None
 
-        # Organize the asset based on file type
-        if file_type == FileType.SCRIPT:
-            script_folder = get_or_create_folder(project_id, "Scripts")
-            frameio_client.move_asset(asset['id'], script_folder['id'])
-        elif file_type == FileType.MEDIA:
-            media_folder = get_or_create_folder(project_id, "Media")
-            frameio_client.move_asset(asset['id'], media_folder['id'])
+        # Tagging and organizing don't affect the upload, so finish them
+        # after the response has been sent
+        background_tasks.add_task(_finalize_asset, asset['id'], project_id, file_type, tag_list)
 
-        return {"status": "success", "asset": asset}
+        return {"status": "accepted", "asset_id": asset['id']}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
 
-def get_or_create_folder(project_id: str, folder_name: str):
-    root_asset = frameio_client.get_project(project_id)['root_asset_id']
-    assets = frameio_client.get_assets(root_asset)
+async def _finalize_asset(asset_id: str, project_id: str, file_type: FileType, tag_list: Optional[List[str]]):
+    # Add metadata (tags) to the asset
+    if tag_list:
+        await frameio.update_asset(
+            asset_id,
+            tags=tag_list
+        )
 
-    for asset in assets:
-        if asset['type'] == 'folder' and asset['name'] == folder_name:
-            return asset
+    # Organize the asset based on file type
+    folder_name = _FOLDER_FOR.get(file_type)
+    if folder_name:
+        folder = await get_or_create_folder(project_id, folder_name)
+        try:
+            await frameio.move_asset(asset_id, folder.id)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                logger.error("Failed to move asset %s into %s: %s", asset_id, folder_name, e)
+                return
+            # The cached folder was deleted upstream; resolve it again and retry once
+            invalidate_folder(folder.id)
+            folder = await get_or_create_folder(project_id, folder_name)
+            try:
+                await frameio.move_asset(asset_id, folder.id)
+            except httpx.HTTPStatusError as e:
+                logger.error("Failed to move asset %s into %s: %s", asset_id, folder_name, e)
+
+# A project's root asset and its top-level folders don't change, so
+# resolved IDs are kept in-process to skip the Frame.io round trips
+_root_asset_cache = TTLCache(maxsize=4096, ttl=3600)
+_folder_cache = TTLCache(maxsize=4096, ttl=3600)
+_folder_locks = TTLCache(maxsize=4096, ttl=3600)
+
+async def get_root_asset_id(project_id: str):
+    root_asset = _root_asset_cache.get(project_id)
+    if root_asset is None:
+        root_asset = (await frameio.get_project(project_id)).root_asset_id
+        _root_asset_cache[project_id] = root_asset
+    return root_asset
+
+async def get_or_create_folder(project_id: str, folder_name: str):
+    key = (project_id, folder_name)
+    folder = _folder_cache.get(key)
+    if folder is not None:
+        return folder
+
+    # Serialize lookups per key so concurrent uploads don't create duplicates
+    async with _folder_locks.setdefault(key, asyncio.Lock()):
+        folder = _folder_cache.get(key)
+        if folder is not None:
+            return folder
+
+        root_asset = await get_root_asset_id(project_id)
+        assets = await frameio.get_assets(root_asset)
+
+        # Index every top-level folder from this one listing so lookups for
+        # the project's other folders don't have to fetch it again
+        for asset in assets:
+            if asset.type == 'folder':
+                _folder_cache.setdefault((project_id, asset.name), asset)
+
+        folder = _folder_cache.get(key)
+        if folder is None:
+            # If folder doesn't exist, create it
+            created = await frameio.create_asset(
+                parent_asset_id=root_asset,
+                name=folder_name,
+                type='folder'
+            )
+            folder = msgspec.convert(created, frameio.Asset)
 
-    # If folder doesn't exist, create it
-    return frameio_client.create_asset(
-        parent_asset_id=root_asset,
-        name=folder_name,
-        type='folder'
-    )
+        _folder_cache[key] = folder
+        return folder
+
+# Deleting or renaming a folder makes its cache entry wrong. These events are
+# relayed to every worker over PROJECT_UPDATES_CHANNEL, see _on_project_update.
+FOLDER_INVALIDATING_EVENTS = {'asset.deleted', 'asset.updated'}
+
+def invalidate_folder(asset_id: str):
+    for key, folder in list(_folder_cache.items()):
+        if folder.id == asset_id:
+            del _folder_cache[key]
 
 # Sequence and Shot management functions
-def create_sequence(project_id: str, name: str):
-    sequences_folder = get_or_create_folder(project_id, "Sequences")
-    return frameio_client.create_asset(
-        parent_asset_id=sequences_folder['id'],
+async def create_sequence(project_id: str, name: str):
+    sequences_folder = await get_or_create_folder(project_id, "Sequences")
+    return await frameio.create_asset(
+        parent_asset_id=sequences_folder.id,
         name=name,
         type='folder'
     )
 
-def create_shot(sequence_id: str, shot: ShotCreate):
-    asset = frameio_client.create_asset(
-        parent_asset_id=sequence_id,
-        name=shot.name,
-        type='file'
-    )
-
-    # Update asset with additional metadata
-    updated_asset = frameio_client.update_asset(
-        asset_id=asset['id'],
-        description=shot.description,
-        properties={
-            'duration': shot.duration
-        }
-    )
+# Caps concurrent shot creations so batch imports stay under Frame.io rate limits
+_shot_create_limit = asyncio.Semaphore(8)
 
-    return updated_asset
+async def create_shot(sequence_id: str, shot: ShotCreate):
+    # Metadata goes in the create call itself rather than a follow-up update
+    async with _shot_create_limit:
+        return await frameio.create_asset(
+            parent_asset_id=sequence_id,
+            name=shot.name,
+            type='file',
+            description=shot.description,
+            properties={
+                'duration': shot.duration
+            }
+        )
 
-def reorder_shots(sequence_id: str, shot_ids: List[str]):
-    return frameio_client.reorder_assets(sequence_id, shot_ids)
+async def reorder_shots(sequence_id: str, shot_ids: List[str]):
+    return await frameio.reorder_assets(sequence_id, shot_ids)
 
 # API endpoints for sequence and shot management
 @app.post("/projects/{project_id}/sequences")
 async def create_sequence_endpoint(project_id: str, sequence: SequenceCreate):
     try:
-        new_sequence = create_sequence(project_id, sequence.name)
+        new_sequence = await create_sequence(project_id, sequence.name)
         return {"status": "success", "sequence": new_sequence}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create sequence: {str(e)}")
@@ -214,39 +358,56 @@ async def create_sequence_endpoint(project_id: str, sequence: SequenceCreate):
 @app.post("/sequences/{sequence_id}/shots")
 async def create_shot_endpoint(sequence_id: str, shot: ShotCreate):
     try:
-        new_shot = create_shot(sequence_id, shot.name)
-        # Update shot with additional metadata
-        updated_shot = frameio_client.update_asset(
-            asset_id=new_shot['id'],
-            description=shot.description,
-            properties={
-                'duration': shot.duration
-            }
-        )
-        return {"status": "success", "shot": updated_shot}
+        new_shot = await create_shot(sequence_id, shot)
+        return {"status": "success", "shot": new_shot}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create shot: {str(e)}")
 
+@app.post("/sequences/{sequence_id}/shots:batch")
+async def create_shots_batch_endpoint(sequence_id: str, shots: List[ShotCreate]):
+    # Shots that succeed are already in Frame.io even if others fail, so each
+    # item reports its own outcome and the client can retry only the failures
+    outcomes = await asyncio.gather(
+        *[create_shot(sequence_id, shot) for shot in shots],
+        return_exceptions=True
+    )
+
+    results = []
+    for index, (shot, outcome) in enumerate(zip(shots, outcomes)):
+        if isinstance(outcome, Exception):
+            results.append({"index": index, "name": shot.name, "status": "error",
+                            "error": f"Failed to create shot: {str(outcome)}"})
+        else:
+            results.append({"index": index, "name": shot.name, "status": "success", "shot": outcome})
+
+    failed = sum(1 for result in results if result["status"] == "error")
+    if not failed:
+        status = "success"
+    elif failed == len(results):
+        status = "failed"
+    else:
+        status = "partial"
+    return {"status": status, "results": results}
+
 @app.put("/sequences/{sequence_id}/reorder")
 async def reorder_shots_endpoint(sequence_id: str, shot_order: ShotOrder):
     try:
-        # Verify that the sequence exists
-        sequence = frameio_client.get_asset(sequence_id)
-        if sequence['type'] != 'folder':
+        # Verify that the sequence exists; get_asset is cached, so repeated
+        # reorders of the same sequence don't refetch it
+        sequence = await frameio.get_asset(sequence_id)
+        if sequence.type != 'folder':
             raise HTTPException(status_code=400, detail="Invalid sequence ID")
 
-        # Get all shots in the sequence
-        shots = frameio_client.get_assets(sequence_id)
-        shot_ids = [shot['id'] for shot in shots if shot['type'] == 'file']
-
-        # Verify that all provided shot IDs exist in the sequence
-        if not all(shot_id in shot_ids for shot_id in shot_order.shot_ids):
-            raise HTTPException(status_code=400, detail="Invalid shot ID provided")
-
-        result = reorder_shots(sequence_id, shot_order.shot_ids)
-        return JSONResponse(content={"status": "success", "result": result})
+        # Frame.io rejects unknown shot IDs itself, so the children aren't
+        # fetched to validate them
+        result = await reorder_shots(sequence_id, shot_order.shot_ids)
+        return {"status": "success", "result": result}
     except HTTPException as he:
         raise he
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code in (400, 404):
+            raise HTTPException(status_code=400, detail="Invalid sequence or shot ID provided")
+        raise HTTPException(status_code=500, detail=f"Failed to reorder shots: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reorder shots: {str(e)}")
 
@@ -271,7 +432,7 @@ class Approval(BaseModel):
 @app.post("/projects/{project_id}/share")
 async def share_project(project_id: str, share: ShareProject):
     try:
-        result = frameio_client.share_project(
+        result = await frameio.share_project(
             project_id=project_id,
             email=share.email,
             permission=share.permission
@@ -283,7 +444,7 @@ async def share_project(project_id: str, share: ShareProject):
 @app.post("/assets/{asset_id}/comment")
 async def add_comment(asset_id: str, comment: Comment):
     try:
-        result = frameio_client.create_comment(
+        result = await frameio.create_comment(
             asset_id=asset_id,
             text=comment.text
         )
@@ -294,8 +455,8 @@ async def add_comment(asset_id: str, comment: Comment):
 @app.post("/assets/{asset_id}/approve")
 async def approve_asset(asset_id: str, approval: Approval):
     try:
-        result = frameio_client.update_asset(
-            asset_id=asset_id,
+        result = await frameio.update_asset(
+            asset_id,
             status=approval.status
         )
         return {"status": "success", "result": result}
@@ -303,53 +464,174 @@ async def approve_asset(asset_id: str, approval: Approval):
         raise HTTPException(status_code=500, detail=f"Failed to update approval status: {str(e)}")
 
 # WebSocket connection for real-time notifications
+# Webhook events are fanned out to every websocket subscribed to the project,
+# so upstream traffic doesn't grow with the number of connected clients.
+# The webhook can land on any worker, so events go through Postgres
+# NOTIFY and each worker delivers them to its own subscribers.
+PROJECT_UPDATES_CHANNEL = "project_updates"
+# NOTIFY payloads must stay under 8000 bytes
+MAX_NOTIFY_PAYLOAD = 7900
+
+subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+async def _start_listener():
+    conn = await app.state.db.acquire()
+    try:
+        await conn.add_listener(PROJECT_UPDATES_CHANNEL, _on_project_update)
+    except Exception:
+        await app.state.db.release(conn)
+        raise
+    conn.add_termination_listener(_on_listener_terminated)
+    app.state.listener = conn
+
+def _on_listener_terminated(connection):
+    logger.warning("Lost the %s listener connection; reconnecting", PROJECT_UPDATES_CHANNEL)
+    app.state.listener_task = asyncio.create_task(_restart_listener(connection))
+
+async def _restart_listener(old_conn):
+    try:
+        await app.state.db.release(old_conn)
+    except Exception:
+        pass
+
+    delay = 1
+    while True:
+        try:
+            await _start_listener()
+            break
+        except Exception as e:
+            logger.warning("Failed to re-establish the %s listener: %s", PROJECT_UPDATES_CHANNEL, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    # Folder invalidations sent while disconnected were missed
+    _folder_cache.clear()
+    app.state.listener_task = None
+    logger.info("Re-established the %s listener", PROJECT_UPDATES_CHANNEL)
+
+async def broadcast_update(update: dict):
+    payload = orjson.dumps(update)
+    if len(payload) > MAX_NOTIFY_PAYLOAD:
+        # Oversized resources are reduced to their ID; clients can fetch the rest
+        resource = update.get('resource') or {}
+        payload = orjson.dumps({**update, "resource": {"id": resource.get('id')}})
+    async with app.state.db.acquire() as conn:
+        await db.notify(conn, PROJECT_UPDATES_CHANNEL, payload.decode())
+
+def _on_project_update(connection, pid, channel, payload):
+    update = orjson.loads(payload)
+    if update['type'] in FOLDER_INVALIDATING_EVENTS:
+        invalidate_folder(update['resource'].get('id'))
+    if update['project_id']:
+        publish_update(update['project_id'], update)
+
+def publish_update(project_id: str, update: dict):
+    for queue in subscribers.get(project_id, ()):
+        try:
+            queue.put_nowait(update)
+        except asyncio.QueueFull:
+            # Drop updates for clients that aren't keeping up
+            pass
+
+async def _receive_subscriptions(websocket: WebSocket, queue: asyncio.Queue, project_ids: set):
+    while True:
+        # The client subscribes by sending a project_id
+        project_id = await websocket.receive_text()
+        subscribers[project_id].add(queue)
+        project_ids.add(project_id)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
+    queue = asyncio.Queue(maxsize=32)
+    project_ids = set()
+    receiver = asyncio.create_task(_receive_subscriptions(websocket, queue, project_ids))
     try:
         while True:
-            # Wait for messages from the client
-            data = await websocket.receive_text()
-
-            # Process the received data (e.g., subscribe to specific project updates)
-            # This is a placeholder and should be replaced with actual logic
-            project_id = data  # Assuming the client sends a project_id
-
-            # Simulate checking for updates (replace with actual Frame.io API calls)
-            updates = await check_for_updates(project_id)
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver.done():
+                getter.cancel()
+                # Re-raises WebSocketDisconnect once the client goes away
+                receiver.result()
 
             # Send updates to the client
-            await websocket.send_json({"message": "Update received", "data": updates})
+            await websocket.send_json({"message": "Update received", "data": getter.result()})
     except WebSocketDisconnect:
         print("WebSocket disconnected")
-
-async def check_for_updates(project_id: str):
-    # This function should be implemented to check for updates in Frame.io
-    # It could involve polling the Frame.io API or integrating with webhooks
-    # For now, we'll return a placeholder update
-    return {"project_id": project_id, "update_type": "new_comment"}
+    finally:
+        receiver.cancel()
+        for project_id in project_ids:
+            subscribers[project_id].discard(queue)
+            if not subscribers[project_id]:
+                del subscribers[project_id]
 
 # Background task to handle notifications
 async def send_notification(user_id: str, message: str):
     # TODO: Implement actual notification logic (e.g., email, push notification)
     print(f"Sending notification to user {user_id}: {message}")
 
+# Webhook storms (e.g. mass approvals) deliver many identical events; only the
+# first per (user_id, asset_id, event_type) within the window is sent
+NOTIFICATION_DEBOUNCE = 0.5
+_pending_notifications: dict[tuple, asyncio.Task] = {}
+
+async def _debounced_send(key: tuple, message: str, delay: float):
+    try:
+        await asyncio.sleep(delay)
+        await send_notification(key[0], message)
+    finally:
+        _pending_notifications.pop(key, None)
+
+def schedule_notification(user_id: str, asset_id: str, event_type: str, message: str):
+    key = (user_id, asset_id, event_type)
+    if key in _pending_notifications:
+        return
+    _pending_notifications[key] = asyncio.create_task(
+        _debounced_send(key, message, NOTIFICATION_DEBOUNCE)
+    )
+
+# Only the fields the handler reads are declared; anything else is skipped
+class WebhookPayload(msgspec.Struct):
+    type: Optional[str] = None
+    resource: dict = msgspec.field(default_factory=dict)
+    project: dict = msgspec.field(default_factory=dict)
+
 @app.post("/webhook")
-async def frame_io_webhook(request: Request, background_tasks: BackgroundTasks):
-    payload = await request.json()
-    event_type = payload.get('type')
-    resource = payload.get('resource', {})
+async def frame_io_webhook(request: Request):
+    try:
+        payload = msgspec.json.decode(await request.body(), type=WebhookPayload)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {str(e)}")
+
+    event_type = payload.type
+    resource = payload.resource
+    project_id = payload.project.get('id')
+
+    if project_id or event_type in FOLDER_INVALIDATING_EVENTS:
+        update = {"project_id": project_id, "type": event_type, "resource": resource}
+        try:
+            await broadcast_update(update)
+        except Exception as e:
+            # Still handle the event here; only other workers miss it
+            logger.error("Failed to broadcast %s for project %s: %s", event_type, project_id, e)
+            if project_id:
+                publish_update(project_id, update)
 
     if event_type == 'comment.created':
         asset_id = resource.get('asset_id')
         comment_text = resource.get('text')
         user_id = resource.get('user_id')
-        background_tasks.add_task(send_notification, user_id, f"New comment on asset {asset_id}: {comment_text}")
+        schedule_notification(user_id, asset_id, event_type, f"New comment on asset {asset_id}: {comment_text}")
     elif event_type == 'review.updated':
         asset_id = resource.get('asset_id')
         status = resource.get('status')
         user_id = resource.get('user_id')
-        background_tasks.add_task(send_notification, user_id, f"Review status updated for asset {asset_id}: {status}")
+        schedule_notification(user_id, asset_id, event_type, f"Review status updated for asset {asset_id}: {status}")
+    elif event_type in FOLDER_INVALIDATING_EVENTS:
+        # Drop any cached folder that was just removed or renamed in Frame.io.
+        # Other workers evict it when the broadcast above reaches them.
+        invalidate_folder(resource.get('id'))
 
     return {"status": "Webhook processed"}
 
@@ -364,34 +646,77 @@ class DirectShareRequest(BaseModel):
     email: str
     permission: str
 
+# Copying a sequence can take a long time, so the export is kicked off in the
+# background and polled by job ID. Jobs are stored in Postgres so any worker
+# can answer the poll.
 @app.post("/export")
-async def export_asset(export_request: ExportRequest):
+async def export_asset(export_request: ExportRequest, background_tasks: BackgroundTasks, conn=Depends(get_db)):
+    job_id = uuid.uuid4().hex
     try:
-        asset = frameio_client.get_asset(export_request.asset_id)
+        await db.create_export_job(conn, job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export asset: {str(e)}")
+
+    background_tasks.add_task(_run_export, job_id, export_request)
+    return {"status": "accepted", "job_id": job_id}
+
+EXPORT_WRITE_ATTEMPTS = 5
+# Finished jobs are kept long enough for clients to read their final state
+EXPORT_JOB_RETENTION = timedelta(days=7)
+EXPORT_PRUNE_INTERVAL = 3600
+
+async def _prune_export_jobs_periodically():
+    while True:
+        try:
+            async with app.state.db.acquire() as conn:
+                await db.prune_export_jobs(conn, list(EXPORT_TERMINAL_STATES), EXPORT_JOB_RETENTION)
+        except Exception as e:
+            logger.warning("Failed to prune export jobs: %s", e)
+        await asyncio.sleep(EXPORT_PRUNE_INTERVAL)
+
+async def _run_export(job_id: str, export_request: ExportRequest):
+    try:
+        asset = await frameio.get_asset(export_request.asset_id)
 
         # Check if the asset is a sequence (folder) or a single file
-        if asset['type'] == 'folder':
+        if asset.type == 'folder':
             # For sequences, we need to create a copy with all its contents
-            exported_asset = frameio_client.copy_asset(export_request.asset_id)
+            exported_asset_id = (await frameio.copy_asset(asset.id, asset.parent_id))['id']
         else:
             # For single files, we can use the original asset
-            exported_asset = asset
+            exported_asset_id = asset.id
 
         # Initiate the export process
-        export_job = frameio_client.create_asset_export_job(
-            asset_id=exported_asset['id'],
+        export_job = await frameio.create_asset_export_job(
+            asset_id=exported_asset_id,
             format=export_request.format
         )
 
-        return {"status": "success", "export_job": export_job}
+        state, export_job_id, error = export_job.get('state', 'processing'), export_job['id'], None
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to export asset: {str(e)}")
+        state, export_job_id, error = "failed", None, f"Failed to export asset: {str(e)}"
+
+    # Losing this write would leave the job pending forever and orphan the
+    # Frame.io export, so it is retried before giving up
+    for attempt in range(EXPORT_WRITE_ATTEMPTS):
+        try:
+            async with app.state.db.acquire() as conn:
+                await db.update_export_job(conn, job_id, state, export_job_id, error)
+            return
+        except Exception as e:
+            last_error = e
+            await asyncio.sleep(2 ** attempt)
+
+    logger.error(
+        "Failed to record export job %s (Frame.io job %s, state %s): %s",
+        job_id, export_job_id, state, last_error
+    )
 
 @app.post("/share")
 async def share_asset(share_request: DirectShareRequest):
     try:
         # Share the asset directly through Frame.io
-        share_result = frameio_client.share_asset(
+        share_result = await frameio.share_asset(
             asset_id=share_request.asset_id,
             email=share_request.email,
             permission=share_request.permission
@@ -401,10 +726,45 @@ async def share_asset(share_request: DirectShareRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to share asset: {str(e)}")
 
+# Clients poll export status, so rendered responses are kept briefly while a
+# job is running and for longer once it reaches a state that can't change
+EXPORT_TERMINAL_STATES = {'completed', 'failed'}
+_export_status_cache = TTLCache(maxsize=10_000, ttl=1)
+_finished_export_cache = TTLCache(maxsize=10_000, ttl=3600)
+
 @app.get("/export/{job_id}")
 async def get_export_status(job_id: str):
+    body = _finished_export_cache.get(job_id) or _export_status_cache.get(job_id)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+
     try:
-        job_status = frameio_client.get_asset_export_job(job_id)
+        async with app.state.db.acquire() as conn:
+            job = await db.get_export_job(conn, job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get export job status: {str(e)}")
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+
+    # Until the Frame.io export job exists, the stored state is all there is
+    if job['export_job_id'] is None:
+        job_status = {"state": job['state']}
+        if job['error']:
+            job_status['error'] = job['error']
         return {"status": "success", "job_status": job_status}
+
+    try:
+        job_status = await frameio.get_asset_export_job(job['export_job_id'])
+        body = orjson.dumps({"status": "success", "job_status": job_status})
+        if job_status.get('state') in EXPORT_TERMINAL_STATES:
+            if job['state'] != job_status['state']:
+                async with app.state.db.acquire() as conn:
+                    await db.update_export_job(conn, job_id, job_status['state'])
+            _export_status_cache.pop(job_id, None)
+            _finished_export_cache[job_id] = body
+        else:
+            _export_status_cache[job_id] = body
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get export job status: {str(e)}")
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from typing import Iterable, List, Optional
+
+# Helpers for asyncpg connections obtained from app.get_db / app.state.db.
+# State that must be visible to every worker process lives here.
+
+# Serializes schema creation when several workers start at once
+_SCHEMA_LOCK_ID = 7318004
+
+async def ensure_schema(conn):
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", _SCHEMA_LOCK_ID)
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS export_jobs (
+                id text PRIMARY KEY,
+                state text NOT NULL,
+                export_job_id text,
+                error text,
+                created_at timestamptz NOT NULL DEFAULT now()
+            )
+            """
+        )
+        # Target of bulk_insert_shots / update_shot_order; columns follow SHOT_COLUMNS
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS shots (
+                id text PRIMARY KEY,
+                sequence_id text NOT NULL,
+                name text NOT NULL,
+                duration double precision,
+                "order" integer
+            )
+            """
+        )
+        await conn.execute("CREATE INDEX IF NOT EXISTS shots_sequence_id_idx ON shots (sequence_id)")
+
+# Cross-worker pub/sub
+async def notify(conn, channel: str, payload: str):
+    await conn.execute("SELECT pg_notify($1, $2)", channel, payload)
+
+# Export jobs
+async def create_export_job(conn, job_id: str):
+    await conn.execute("INSERT INTO export_jobs (id, state) VALUES ($1, 'pending')", job_id)
+
+async def update_export_job(conn, job_id: str, state: str, export_job_id: Optional[str] = None, error: Optional[str] = None):
+    await conn.execute(
+        "UPDATE export_jobs SET state = $2, export_job_id = COALESCE($3, export_job_id), error = $4 WHERE id = $1",
+        job_id, state, export_job_id, error
+    )
+
+async def get_export_job(conn, job_id: str):
+    return await conn.fetchrow("SELECT state, export_job_id, error FROM export_jobs WHERE id = $1", job_id)
+
+async def prune_export_jobs(conn, terminal_states: List[str], max_age: timedelta):
+    return await conn.execute(
+        "DELETE FROM export_jobs WHERE state = ANY($1::text[]) AND created_at < now() - $2::interval",
+        terminal_states, max_age
+    )
+
+# Bulk writes
+# COPY and executemany let asyncpg stream rows / reuse one prepared statement
+# instead of paying a round trip and parse per row.
+
+SHOT_COLUMNS = ('id', 'sequence_id', 'name', 'duration', 'order')
+
+async def bulk_insert_shots(conn, rows: Iterable[tuple]):
+    # rows follow SHOT_COLUMNS
+    return await conn.copy_records_to_table('shots', records=rows, columns=SHOT_COLUMNS)
+
+async def update_shot_order(conn, shot_ids: List[str]):
+    async with conn.transaction():
+        await conn.executemany(
+            'UPDATE shots SET "order" = $2 WHERE id = $1',
+            [(shot_id, i) for i, shot_id in enumerate(shot_ids)]
+        )
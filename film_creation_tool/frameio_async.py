@@ -0,0 +1,221 @@
+import httpx
+import asyncio
+import functools
+import msgspec
+from cachetools import TTLCache
+from typing import Optional, List
+
+# Frame.io REST API wrapper built on a shared httpx.AsyncClient.
+# The client is created by start() from the app's startup hook and reused
+# for every request so connections (and TLS sessions) stay alive.
+
+FRAMEIO_API_URL = "https://api.frame.io/v2"
+
+client: Optional[httpx.AsyncClient] = None
+# Pre-signed upload URLs must not receive the Frame.io bearer token
+upload_client: Optional[httpx.AsyncClient] = None
+
+async def start(token: str):
+    global client, upload_client
+    limits = httpx.Limits(max_keepalive_connections=50, max_connections=100)
+    client = httpx.AsyncClient(
+        base_url=FRAMEIO_API_URL,
+        http2=True,
+        limits=limits,
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    upload_client = httpx.AsyncClient(http2=True, limits=limits)
+
+async def close():
+    global client, upload_client
+    if client is not None:
+        await client.aclose()
+        client = None
+    if upload_client is not None:
+        await upload_client.aclose()
+        upload_client = None
+
+# Typed records for responses the app only reads internally. Decoding
+# straight into structs gives attribute access instead of dict lookups.
+class Asset(msgspec.Struct, frozen=True):
+    id: str
+    type: str
+    name: str
+    parent_id: Optional[str] = None
+
+class Project(msgspec.Struct, frozen=True):
+    id: str
+    name: str
+    root_asset_id: str
+
+async def _request(method: str, url: str, type=None, **kwargs):
+    response = await client.request(method, url, **kwargs)
+    response.raise_for_status()
+    if type is not None:
+        return msgspec.json.decode(response.content, type=type)
+    return response.json()
+
+def _cached(ttl: float, maxsize: int = 10_000):
+    # Short-lived cache for idempotent reads that clients poll repeatedly.
+    # Concurrent misses for the same key share one in-flight request.
+    def decorator(func):
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        inflight: dict[tuple, asyncio.Task] = {}
+
+        def store(args, task):
+            # Skip results of requests started before an invalidate()
+            if inflight.get(args) is not task:
+                return
+            del inflight[args]
+            if not task.cancelled() and task.exception() is None:
+                cache[args] = task.result()
+
+        @functools.wraps(func)
+        async def wrapper(*args):
+            try:
+                return cache[args]
+            except KeyError:
+                pass
+            task = inflight.get(args)
+            if task is None:
+                task = asyncio.ensure_future(func(*args))
+                inflight[args] = task
+                task.add_done_callback(functools.partial(store, args))
+            # Shielded so one caller being cancelled doesn't cancel the others
+            return await asyncio.shield(task)
+
+        def invalidate(*args):
+            cache.pop(args, None)
+            inflight.pop(args, None)
+
+        wrapper.cache = cache
+        wrapper.invalidate = invalidate
+        return wrapper
+    return decorator
+
+async def get_me():
+    return await _request("GET", "/me")
+
+# Projects
+async def create_project(team_id: str, **fields):
+    return await _request("POST", f"/teams/{team_id}/projects", json=fields)
+
+@_cached(ttl=5)
+async def get_project(project_id: str):
+    return await _request("GET", f"/projects/{project_id}", type=Project)
+
+async def update_project(project_id: str, **fields):
+    get_project.invalidate(project_id)
+    return await _request("PUT", f"/projects/{project_id}", json=fields)
+
+async def share_project(project_id: str, email: str, permission: str):
+    return await _request(
+        "POST",
+        f"/projects/{project_id}/collaborators",
+        json={"email": email, "permission": permission}
+    )
+
+# Assets
+@_cached(ttl=2)
+async def get_asset(asset_id: str):
+    return await _request("GET", f"/assets/{asset_id}", type=Asset)
+
+ASSETS_PAGE_SIZE = 100
+
+async def get_assets(parent_asset_id: str):
+    # Children are paginated; fetch the first page to learn the page count,
+    # then the remaining pages concurrently
+    url = f"/assets/{parent_asset_id}/children"
+    response = await client.get(url, params={"page": 1, "page_size": ASSETS_PAGE_SIZE})
+    response.raise_for_status()
+    assets = msgspec.json.decode(response.content, type=list[Asset])
+
+    total_pages = int(response.headers.get("total-pages", 1))
+    if total_pages > 1:
+        pages = await asyncio.gather(*[
+            _request("GET", url, type=list[Asset], params={"page": page, "page_size": ASSETS_PAGE_SIZE})
+            for page in range(2, total_pages + 1)
+        ])
+        for page in pages:
+            assets.extend(page)
+    return assets
+
+async def create_asset(parent_asset_id: str, **fields):
+    return await _request("POST", f"/assets/{parent_asset_id}/children", json=fields)
+
+async def update_asset(asset_id: str, **fields):
+    get_asset.invalidate(asset_id)
+    return await _request("PUT", f"/assets/{asset_id}", json=fields)
+
+async def move_asset(asset_id: str, folder_id: str):
+    get_asset.invalidate(asset_id)
+    return await _request("POST", f"/assets/{folder_id}/move", json={"id": asset_id})
+
+async def copy_asset(asset_id: str, folder_id: str):
+    return await _request("POST", f"/assets/{folder_id}/copy", json={"id": asset_id})
+
+async def reorder_assets(parent_asset_id: str, asset_ids: List[str]):
+    return await _request(
+        "POST",
+        f"/assets/{parent_asset_id}/reorder",
+        json={"asset_ids": asset_ids}
+    )
+
+async def share_asset(asset_id: str, email: str, permission: str):
+    return await _request(
+        "POST",
+        f"/assets/{asset_id}/collaborators",
+        json={"email": email, "permission": permission}
+    )
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+async def _stream(file, length: int):
+    # Yield at most `length` bytes from the upload in fixed-size chunks
+    while length > 0:
+        chunk = await file.read(min(UPLOAD_CHUNK_SIZE, length))
+        if not chunk:
+            break
+        length -= len(chunk)
+        yield chunk
+
+async def upload(parent_asset_id: str, file, file_name: str):
+    size = file.size
+    if size is None:
+        file.file.seek(0, 2)
+        size = file.file.tell()
+        await file.seek(0)
+
+    asset = await create_asset(
+        parent_asset_id,
+        name=file_name,
+        type="file",
+        filetype=file.content_type,
+        filesize=size
+    )
+
+    # Frame.io hands back one pre-signed URL per upload part; each part is
+    # streamed straight from the spooled upload instead of buffered in memory
+    upload_urls = asset["upload_urls"]
+    part_size = -(-size // len(upload_urls))
+    for i, upload_url in enumerate(upload_urls):
+        length = min(part_size, size - i * part_size)
+        response = await upload_client.put(
+            upload_url,
+            content=_stream(file, length),
+            headers={"Content-Length": str(length), "x-amz-acl": "private"}
+        )
+        response.raise_for_status()
+
+    return asset
+
+# Comments
+async def create_comment(asset_id: str, text: str):
+    return await _request("POST", f"/assets/{asset_id}/comments", json={"text": text})
+
+# Exports
+async def create_asset_export_job(asset_id: str, format: str):
+    return await _request("POST", f"/assets/{asset_id}/exports", json={"format": format})
+
+async def get_asset_export_job(job_id: str):
+    return await _request("GET", f"/exports/{job_id}")